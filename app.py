@@ -1,15 +1,31 @@
 # app.py
 import re
+import io
+import csv
 import time
+import string
+import functools
+import hashlib
 import base64
 import sqlite3
 import json
 import os
+import queue
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html import unescape
 from urllib.parse import urlparse, urljoin, parse_qs
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+from lxml.html import fromstring as lxml_fromstring, HTMLParser as LxmlHTMLParser
 import streamlit as st
 from urllib.robotparser import RobotFileParser
 
@@ -19,6 +35,12 @@ try:
 except Exception:
     dnsresolver = None
 
+# Optional: fast Lexbor-based HTML parser (falls back to lxml.html)
+try:
+    from selectolax.lexbor import LexborHTMLParser  # requires "selectolax"
+except Exception:
+    LexborHTMLParser = None
+
 # ----------------------------
 # Streamlit page setup
 # ----------------------------
@@ -26,12 +48,16 @@ st.set_page_config(page_title="Miami Master Flooring Lead Finder", layout="wide"
 st.title("🚀 Miami Master Flooring — Lead Finder & Email Drafts")
 
 DEFAULT_SENDER = "info@miamimasterflooring.com"
+LEAD_COLUMNS = ["Company", "Email", "Website", "Phone", "Source", "EmailVerified", "MXDomain"]
+DRAFT_COLUMNS = ["To", "Company", "Website", "Phone", "From", "Subject", "Body"]
 
-# Session state
-if "leads_df" not in st.session_state:
-    st.session_state.leads_df = pd.DataFrame(
-        columns=["Company", "Email", "Website", "Phone", "Source", "EmailVerified", "MXDomain"]
-    )
+# Session state: leads are kept as plain row dicts (deduped on Email+Website as
+# they arrive) and only turned into a DataFrame for display/export
+if "leads_rows" not in st.session_state:
+    st.session_state.leads_rows = []
+    st.session_state.lead_keys = set()
+if "crawled_domains" not in st.session_state:
+    st.session_state.crawled_domains = set()
 
 # ----------------------------
 # Helpers
@@ -44,37 +70,166 @@ UA_STR = (
 UA = {"User-Agent": UA_STR, "Accept-Language": "en-US,en;q=0.9"}
 
 EMAIL_REGEX = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
-PHONE_REGEX = re.compile(r"\b(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b")
+# Image filenames like "logo@2x.png" are rejected in-pattern. The domain is
+# matched atomically (a lookahead capture replayed by backreference, since
+# (?>...) needs Python 3.11) so a rejected match cannot backtrack to a shorter
+# fake email ("banner@2x.hero.jpg", "x@cdn.site.png", "a@b.com.gif" must all
+# yield nothing)
+_EMAIL_PATTERN = (
+    r"\b[A-Za-z0-9._%+-]+@(?=(?P<email_domain>[A-Za-z0-9.-]+\.[A-Za-z]{2,}))(?P=email_domain)\b"
+    r"(?<!(?i:\.png|\.jpg|\.gif))(?<!(?i:\.jpeg|\.webp))"
+)
+_PHONE_PATTERN = r"\b(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b"
+# Emails and phones in one pass over decoded text
+CONTACT_INFO_REGEX = re.compile(f"(?P<email>{_EMAIL_PATTERN})|(?P<phone>{_PHONE_PATTERN})")
+# Used alone when a page has no "@" and so cannot contain an email
+PHONE_REGEX = re.compile(_PHONE_PATTERN)
+_DIGIT_RE = re.compile(r"\d")
+# Quoted <a> href values that look like contact/about/team pages, read straight
+# off the markup (<link>/<script> hrefs in <head> are not candidates)
+CONTACT_HREF_REGEX = re.compile(
+    r"""<a\s(?:[^>]*?\s)?href\s*=\s*["']([^"']*(?:contact|about|team)[^"']*)["']""", re.I
+)
+MAX_CONTACT_PAGES = 6
+
+# Tried in order when naming a company from its homepage
+COMPANY_NAME_SELECTORS = (
+    'meta[property="og:site_name"]',
+    'meta[property="og:title"]',
+    "h1",
+    "title",
+)
+# lxml fallback equivalents of the selectors above, compiled once
+COMPANY_NAME_XPATHS = tuple(
+    etree.XPath(expr)
+    for expr in (
+        '(//meta[@property="og:site_name"])[1]',
+        '(//meta[@property="og:title"])[1]',
+        "(//h1)[1]",
+        "(//title)[1]",
+    )
+)
+LINK_HREF_XPATH = etree.XPath("//a/@href")
+
+# Contact info is scanned in visible text only; inline JS/CSS is skipped, except
+# JSON-LD blocks, which often carry the business email/phone
+TEXT_SKIP_TAGS = {"script", "style", "noscript"}
+VISIBLE_TEXT_XPATH = etree.XPath(
+    "//text()[not(ancestor::script or ancestor::style or ancestor::noscript)]"
+    " | //script[@type='application/ld+json']/text()"
+)
 
 COMPETITOR_WORDS = {"floor", "tile", "carpet"}  # used if you want to exclude flooring companies
+COMPETITOR_REGEX = re.compile("|".join(map(re.escape, sorted(COMPETITOR_WORDS))), re.I)
 CACHE_DB = "cache.db"
 CACHE_TTL_SECONDS = 7 * 24 * 3600  # 7 days
+SEARCH_CACHE_TTL_SECONDS = 3600  # search results go stale much faster than pages
+CRAWL_WORKERS = 16  # default number of sites crawled concurrently
+PER_HOST_CONCURRENCY = 2  # max in-flight fetches against a single host
+MAX_PAGE_BYTES = 2 * 1024 * 1024  # bigger bodies are almost always PDFs/binaries
+MAX_READ_BYTES = 512 * 1024  # read at most this much of any one page
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml")
+SKIP_EXTENSIONS = (".pdf", ".doc", ".docx", ".zip", ".jpg", ".jpeg", ".png", ".gif", ".mp4")
 
 # ----------------------------
 # SQLite cache
 # ----------------------------
-def init_db():
-    con = sqlite3.connect(CACHE_DB)
-    cur = con.cursor()
-    cur.execute(
-        "CREATE TABLE IF NOT EXISTS cache_pages (url TEXT PRIMARY KEY, html TEXT, fetched_at REAL)"
+# Long-lived connections shared by the crawl workers instead of a
+# connect/commit/close per lookup: one writer (serialized by a lock) plus a
+# pool of read-only connections, so cache hits never queue behind writes.
+# WAL lets the readers run alongside the writer; synchronous=NORMAL keeps
+# commits from fsyncing on every insert. (No cache=shared: it hurts under WAL.)
+CACHE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA busy_timeout=5000",
+)
+CACHE_READERS = 8
+
+def url_hash(url: str) -> int:
+    # Signed 64-bit key so lookups walk an integer index instead of comparing long
+    # URLs; queries match "url_hash = ? AND +url = ?" (the + keeps SQLite off the
+    # url index, and the url term guards against hash collisions)
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "big", signed=True)
+
+def _add_url_hash(con, table: str):
+    # Older cache.db files predate url_hash; backfill existing rows once
+    cols = {row[1] for row in con.execute(f"PRAGMA table_info({table})")}
+    if "url_hash" not in cols:
+        con.execute(f"ALTER TABLE {table} ADD COLUMN url_hash INTEGER")
+        con.create_function("url_hash", 1, url_hash, deterministic=True)
+        con.execute(f"UPDATE {table} SET url_hash = url_hash(url)")
+    con.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_url_hash ON {table}(url_hash)")
+
+# Streamlit re-executes this script on every widget interaction; cache_resource
+# opens the connections (and runs the migrations) once per process, and every
+# rerun and browser session shares them, along with the writer lock
+@st.cache_resource
+def init_db() -> tuple[sqlite3.Connection, threading.Lock, queue.Queue]:
+    con = sqlite3.connect(CACHE_DB, check_same_thread=False, isolation_level=None)
+    for pragma in CACHE_PRAGMAS:
+        con.execute(pragma)
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS cache_pages (url TEXT PRIMARY KEY, html TEXT, fetched_at REAL, url_hash INTEGER)"
     )
-    cur.execute(
+    con.execute(
         "CREATE TABLE IF NOT EXISTS cache_robots (host TEXT PRIMARY KEY, content TEXT, fetched_at REAL)"
     )
-    cur.execute(
-        "CREATE TABLE IF NOT EXISTS cache_emails (url TEXT PRIMARY KEY, emails TEXT, phone TEXT, fetched_at REAL)"
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS cache_emails (url TEXT PRIMARY KEY, emails TEXT, phone TEXT, fetched_at REAL, verified TEXT, "
+        "url_hash INTEGER)"
+    )
+    # Older cache.db files predate the MX verification column
+    email_cols = {row[1] for row in con.execute("PRAGMA table_info(cache_emails)")}
+    if "verified" not in email_cols:
+        con.execute("ALTER TABLE cache_emails ADD COLUMN verified TEXT")
+    _add_url_hash(con, "cache_pages")
+    _add_url_hash(con, "cache_emails")
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS cache_search (engine TEXT, query TEXT, max_results INTEGER, results TEXT, fetched_at REAL, "
+        "PRIMARY KEY (engine, query, max_results))"
     )
-    con.commit()
-    con.close()
+    readers = queue.Queue()
+    for _ in range(CACHE_READERS):
+        reader = sqlite3.connect(f"file:{CACHE_DB}?mode=ro", uri=True, check_same_thread=False)
+        reader.execute("PRAGMA query_only=1")
+        reader.execute("PRAGMA cache_size=-20000")
+        reader.execute("PRAGMA busy_timeout=5000")
+        readers.put(reader)
+    return con, threading.Lock(), readers
+
+@contextmanager
+def _cache_reader():
+    con = _cache_readers.get()
+    try:
+        yield con
+    finally:
+        _cache_readers.put(con)
+
+def _cache_fetchone(sql: str, params: tuple):
+    with _cache_reader() as con:
+        return con.execute(sql, params).fetchone()
+
+def _cache_write(sql: str, params: tuple):
+    with _cache_lock:
+        _cache_con.execute("BEGIN IMMEDIATE")
+        try:
+            _cache_con.execute(sql, params)
+            _cache_con.execute("COMMIT")
+        except Exception:
+            # The writer is shared by the whole process; never leave it inside
+            # a transaction (SQLite may already have rolled back on its own)
+            if _cache_con.in_transaction:
+                _cache_con.execute("ROLLBACK")
+            raise
 
 def cache_get_page(url: str):
     try:
-        con = sqlite3.connect(CACHE_DB)
-        cur = con.cursor()
-        cur.execute("SELECT html, fetched_at FROM cache_pages WHERE url = ?", (url,))
-        row = cur.fetchone()
-        con.close()
+        row = _cache_fetchone(
+            "SELECT html, fetched_at FROM cache_pages WHERE url_hash = ? AND +url = ?", (url_hash(url), url)
+        )
         if not row:
             return None, None
         html, ts = row
@@ -84,24 +239,16 @@ def cache_get_page(url: str):
 
 def cache_put_page(url: str, html: str, ts: float):
     try:
-        con = sqlite3.connect(CACHE_DB)
-        cur = con.cursor()
-        cur.execute(
-            "INSERT OR REPLACE INTO cache_pages (url, html, fetched_at) VALUES (?, ?, ?)",
-            (url, html, ts),
+        _cache_write(
+            "INSERT OR REPLACE INTO cache_pages (url, url_hash, html, fetched_at) VALUES (?, ?, ?, ?)",
+            (url, url_hash(url), html, ts),
         )
-        con.commit()
-        con.close()
     except Exception:
         pass
 
 def cache_get_robots(host: str):
     try:
-        con = sqlite3.connect(CACHE_DB)
-        cur = con.cursor()
-        cur.execute("SELECT content, fetched_at FROM cache_robots WHERE host = ?", (host,))
-        row = cur.fetchone()
-        con.close()
+        row = _cache_fetchone("SELECT content, fetched_at FROM cache_robots WHERE host = ?", (host,))
         if not row:
             return None, None
         content, ts = row
@@ -111,130 +258,314 @@ def cache_get_robots(host: str):
 
 def cache_put_robots(host: str, content: str, ts: float):
     try:
-        con = sqlite3.connect(CACHE_DB)
-        cur = con.cursor()
-        cur.execute(
+        _cache_write(
             "INSERT OR REPLACE INTO cache_robots (host, content, fetched_at) VALUES (?, ?, ?)",
             (host, content, ts),
         )
-        con.commit()
-        con.close()
     except Exception:
         pass
 
 def cache_get_emails(url: str):
+    # verified maps email -> [ok, mx_domain, checked_at] from the last MX check
     try:
-        con = sqlite3.connect(CACHE_DB)
-        cur = con.cursor()
-        cur.execute("SELECT emails, phone, fetched_at FROM cache_emails WHERE url = ?", (url,))
-        row = cur.fetchone()
-        con.close()
+        row = _cache_fetchone(
+            "SELECT emails, phone, fetched_at, verified FROM cache_emails WHERE url_hash = ? AND +url = ?",
+            (url_hash(url), url),
+        )
         if not row:
-            return None, None, None
-        emails_json, phone, ts = row
+            return None, None, None, None
+        emails_json, phone, ts, verified_json = row
         emails = json.loads(emails_json) if emails_json else []
-        return emails, phone, ts
+        verified = json.loads(verified_json) if verified_json else {}
+        return emails, phone, ts, verified
     except Exception:
-        return None, None, None
+        return None, None, None, None
 
-def cache_put_emails(url: str, emails: list, phone: str, ts: float):
+def cache_put_emails(url: str, emails: list, phone: str, ts: float, verified: dict | None = None):
     try:
-        con = sqlite3.connect(CACHE_DB)
-        cur = con.cursor()
-        cur.execute(
-            "INSERT OR REPLACE INTO cache_emails (url, emails, phone, fetched_at) VALUES (?, ?, ?, ?)",
-            (url, json.dumps(emails), phone or "", ts),
+        _cache_write(
+            "INSERT OR REPLACE INTO cache_emails (url, url_hash, emails, phone, fetched_at, verified) VALUES (?, ?, ?, ?, ?, ?)",
+            (url, url_hash(url), json.dumps(emails), phone or "", ts, json.dumps(verified) if verified else None),
         )
-        con.commit()
-        con.close()
     except Exception:
         pass
 
-init_db()
+def cache_get_search(engine: str, query: str, max_results: int):
+    try:
+        row = _cache_fetchone(
+            "SELECT results, fetched_at FROM cache_search WHERE engine = ? AND query = ? AND max_results = ?",
+            (engine, query, max_results),
+        )
+        if not row:
+            return None, None
+        results_json, ts = row
+        return json.loads(results_json), ts
+    except Exception:
+        return None, None
+
+def cache_put_search(engine: str, query: str, max_results: int, results: list, ts: float):
+    try:
+        _cache_write(
+            "INSERT OR REPLACE INTO cache_search (engine, query, max_results, results, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (engine, query, max_results, json.dumps(results), ts),
+        )
+    except Exception:
+        pass
+
+_cache_con, _cache_lock, _cache_readers = init_db()
 
 # ----------------------------
 # Network and parsing utils
 # ----------------------------
+@functools.lru_cache(maxsize=4096)
+def parse_url(url: str):
+    # The same links are parsed by dedupe, list filters, robots and fetch;
+    # ParseResult is an immutable tuple, so sharing cached results is safe
+    return urlparse(url)
+
 def domain(url: str) -> str:
     try:
-        return urlparse(url).netloc.lower()
+        return parse_url(url).netloc.lower()
     except Exception:
         return ""
 
+def is_skippable_url(url: str) -> bool:
+    # Documents/media never contain a crawlable page; skip them before any request
+    try:
+        return parse_url(url).path.lower().endswith(SKIP_EXTENSIONS)
+    except Exception:
+        return False
+
 def normalize_url(u: str) -> str:
     try:
-        parsed = urlparse(u)
+        parsed = parse_url(u)
         if not parsed.scheme:
             u = "http://" + u
         return u
     except Exception:
         return u
 
-def safe_get(url: str, timeout: int = 12) -> requests.Response | None:
+class NoReadTimeoutRetry(Retry):
+    # A read timeout already cost the full timeout, so it is not retried; other
+    # read errors (a pooled keep-alive socket the server closed) still are
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if isinstance(error, ReadTimeoutError):
+            raise error
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+def build_http_session() -> requests.Session:
+    s = requests.Session()
+    s.headers.update(UA)
+    retries = NoReadTimeoutRetry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,  # hand the final response back like a plain request
+        # Retry-After can ask for hours, and the wait would run while a
+        # host_slot is held; stick to the short backoff instead
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=50, pool_maxsize=100, max_retries=retries)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+# One pooled session per browser session so keep-alive sockets survive reruns
+if "http_session" not in st.session_state:
+    st.session_state.http_session = build_http_session()
+SESSION = st.session_state.http_session
+
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+def host_slot(url: str) -> threading.BoundedSemaphore:
+    host = domain(url)
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(PER_HOST_CONCURRENCY)
+        return slot
+
+_host_next_at: dict[str, float] = {}
+_host_next_at_lock = threading.Lock()
+
+def wait_for_host(url: str, delay_s: float):
+    # Per-host politeness: reserve the next start time for this host and sleep
+    # only until then, so other hosts are never stalled
+    host = domain(url)
+    with _host_next_at_lock:
+        now = time.monotonic()
+        start = max(now, _host_next_at.get(host, 0.0))
+        _host_next_at[host] = start + delay_s
+    if start > now:
+        time.sleep(start - now)
+
+# Response-like result of safe_get, for both cache hits and streamed fetches
+# (text may be truncated)
+FetchedPage = namedtuple("FetchedPage", ["text", "ok", "status_code"])
+
+def response_encoding(r: requests.Response) -> str:
+    # The declared charset, else UTF-8. requests falls back to ISO-8859-1 for
+    # any text/* without a charset, which garbles most modern pages.
+    has_charset = "charset" in r.headers.get("Content-Type", "").lower()
+    return (r.encoding if has_charset else None) or "utf-8"
+
+def read_page_text(r: requests.Response) -> str:
+    # Stream the raw body up to MAX_READ_BYTES and decode it once at the end
+    # with the declared charset (UTF-8 otherwise), never through charset
+    # detection. There is no earlier cut-off on seeing an email: the raw bytes
+    # can't tell a placeholder or meta value from the visible text scan_page
+    # accepts, and a cut page would be cached without the real address.
+    parts = []
+    size = 0
+    for chunk in r.iter_content(chunk_size=65536):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= MAX_READ_BYTES:
+            break
+    encoding = response_encoding(r)
+    try:
+        return b"".join(parts).decode(encoding, errors="replace")
+    except LookupError:
+        return b"".join(parts).decode("utf-8", errors="replace")
+
+def safe_get(url: str, timeout: int = 12, delay_s: float = 0.0) -> FetchedPage | None:
     # Try cache first
     html, ts = cache_get_page(url)
     now = time.time()
     if html and ts and (now - ts) < CACHE_TTL_SECONDS:
-        # Build a fake Response-like object
-        class R:
-            def __init__(self, text):
-                self.text = text
-                self.ok = True
-        return R(html)
+        return FetchedPage(html, True, 200)
 
     try:
-        r = requests.get(url, headers=UA, timeout=timeout, allow_redirects=True)
-        if r and r.ok and r.text:
-            cache_put_page(url, r.text, time.time())
-        return r
+        with host_slot(url):
+            wait_for_host(url, delay_s)
+            with SESSION.get(url, timeout=timeout, allow_redirects=True, stream=True) as r:
+                length = r.headers.get("Content-Length", "")
+                if length.isdigit() and int(length) > MAX_PAGE_BYTES:
+                    return None
+                ctype = r.headers.get("Content-Type", "").lower()
+                if ctype and not ctype.startswith(HTML_CONTENT_TYPES):
+                    return None
+                page = FetchedPage(read_page_text(r), r.ok, r.status_code)
+        if page.ok and page.text:
+            cache_put_page(url, page.text, time.time())
+        return page
     except Exception:
         return None
 
-def extract_company_name(html: str, url: str) -> str:
+_lxml_local = threading.local()
+
+def _lxml_parser() -> LxmlHTMLParser:
+    # lxml locks a parser shared between threads; one per worker thread keeps
+    # the (GIL-free) C parse running in parallel
+    parser = getattr(_lxml_local, "parser", None)
+    if parser is None:
+        parser = _lxml_local.parser = LxmlHTMLParser(encoding="utf-8")
+    return parser
+
+def parse_html(html: str):
+    # selectolax tree when available, lxml.html otherwise; pass the result
+    # as `tree` to the extractors below to avoid parsing a page twice
+    if LexborHTMLParser is not None:
+        return LexborHTMLParser(html)
+    return lxml_fromstring(html.encode("utf-8", "replace"), parser=_lxml_parser())
+
+def extract_company_name(html: str, url: str, tree=None) -> str:
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        for selector in [
-            'meta[property="og:site_name"]',
-            'meta[property="og:title"]',
-            "h1",
-            "title",
-        ]:
-            el = soup.select_one(selector)
-            if el:
-                text = el.get("content") or el.get_text()
+        if tree is None:
+            tree = parse_html(html)
+        if LexborHTMLParser is not None:
+            for selector in COMPANY_NAME_SELECTORS:
+                node = tree.css_first(selector)
+                if node is not None:
+                    text = node.attributes.get("content") or node.text()
+                    text = (text or "").strip()
+                    if text:
+                        return text[:120]
+            return _domain_fallback_name(url)
+        for xpath in COMPANY_NAME_XPATHS:
+            found = xpath(tree)
+            if found:
+                el = found[0]
+                text = el.get("content") or el.text_content()
                 text = (text or "").strip()
                 if text:
                     return text[:120]
     except Exception:
         pass
+    return _domain_fallback_name(url)
+
+def _domain_fallback_name(url: str) -> str:
     d = domain(url)
     return d.replace("www.", "") if d else ""
 
-def extract_phone(html: str) -> str:
-    m = PHONE_REGEX.search(html or "")
-    return m.group(0) if m else ""
-
 def find_likely_contact_pages(base_url: str, html: str) -> list[str]:
-    pages = set()
+    pages = {}  # insertion-ordered set: document order first, then fallbacks
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            hlow = href.lower()
-            if any(key in hlow for key in ["contact", "contact-us", "about", "team"]):
-                pages.add(urljoin(base_url, href))
+        for m in CONTACT_HREF_REGEX.finditer(html or ""):
+            url = urljoin(base_url, unescape(m.group(1)))
+            if parse_url(url).scheme not in ("http", "https"):
+                continue  # mailto:contact@..., javascript:, tel:
+            pages.setdefault(url, None)
+            if len(pages) >= MAX_CONTACT_PAGES:
+                break
     except Exception:
         pass
+    # The fallbacks are always tried, on top of the capped link candidates
     for suffix in ("/contact", "/contact-us", "/about"):
-        pages.add(urljoin(base_url, suffix))
-    return list(pages)[:6]
+        pages.setdefault(urljoin(base_url, suffix), None)
+    return list(pages)
+
+def page_contact_text(tree) -> str:
+    # Visible text nodes plus mailto:/tel: hrefs of a parsed page
+    if LexborHTMLParser is not None:
+        parts = []
+        root = tree.root
+        if root is not None:
+            for node in root.traverse(include_text=True):
+                if node.tag != "-text":
+                    continue
+                parent = node.parent
+                if (
+                    parent is None
+                    or parent.tag not in TEXT_SKIP_TAGS
+                    or parent.attributes.get("type") == "application/ld+json"
+                ):
+                    parts.append(node.text_content or "")
+        hrefs = (node.attributes.get("href") or "" for node in tree.css("a[href]"))
+    else:
+        parts = [str(t) for t in VISIBLE_TEXT_XPATH(tree)]
+        hrefs = LINK_HREF_XPATH(tree)
+    parts.extend(h for h in hrefs if h.lower().startswith(("mailto:", "tel:")))
+    return "\n".join(parts)
+
+def scan_page(html: str, tree=None) -> tuple[set[str], str]:
+    # Scan the page's text nodes rather than the raw markup; fall back to the
+    # raw HTML if it cannot be parsed
+    try:
+        if tree is None:
+            tree = parse_html(html)
+        return scan_contact_info(page_contact_text(tree))
+    except Exception:
+        return scan_contact_info(html)
 
-def extract_emails_from_text(text: str) -> list[str]:
-    emails = {
-        e for e in EMAIL_REGEX.findall(text or "")
-        if not e.lower().endswith((".png", ".jpg", ".jpeg", ".gif", ".webp"))
-    }
-    return sorted(emails)
+def scan_contact_info(text: str) -> tuple[set[str], str]:
+    # Returns (emails, first phone) from a single regex pass
+    text = text or ""
+    emails = set()
+    phone = ""
+    # Cheap substring checks first: most pages have no email at all
+    if "@" not in text:
+        if not _DIGIT_RE.search(text):
+            return emails, phone
+        m = PHONE_REGEX.search(text)
+        return emails, (m.group() if m else phone)
+    for m in CONTACT_INFO_REGEX.finditer(text):
+        if m.lastgroup == "email":
+            emails.add(m.group())
+        elif not phone:
+            phone = m.group()
+    return emails, phone
 
 # ----------------------------
 # robots.txt handling (cached)
@@ -246,8 +577,9 @@ def fetch_robots_for_host(host: str, delay_s: float):
         return content
     try:
         robots_url = f"https://{host}/robots.txt"
-        time.sleep(delay_s)
-        r = requests.get(robots_url, headers=UA, timeout=12)
+        with host_slot(robots_url):
+            wait_for_host(robots_url, delay_s)
+            r = SESSION.get(robots_url, timeout=12)
         text = r.text if (r and r.ok and r.text) else ""
         cache_put_robots(host, text, time.time())
         return text
@@ -255,15 +587,28 @@ def fetch_robots_for_host(host: str, delay_s: float):
         cache_put_robots(host, "", time.time())
         return ""
 
+# Parsed robots.txt per host for this run; None means no usable robots.txt
+_robots_parsers: dict[str, RobotFileParser | None] = {}
+_robots_parsers_lock = threading.Lock()
+
+def robots_parser_for_host(host: str, delay_s: float) -> RobotFileParser | None:
+    with _robots_parsers_lock:
+        if host in _robots_parsers:
+            return _robots_parsers[host]
+    content = fetch_robots_for_host(host, delay_s)
+    rp = None
+    if content:
+        rp = RobotFileParser()
+        rp.parse(content.splitlines())
+    with _robots_parsers_lock:
+        return _robots_parsers.setdefault(host, rp)
+
 def is_allowed_by_robots(url: str, delay_s: float) -> bool:
     try:
-        parsed = urlparse(url)
+        parsed = parse_url(url)
         host = parsed.netloc
-        content = fetch_robots_for_host(host, delay_s)
-        rp = RobotFileParser()
-        if content:
-            rp.parse(content.splitlines())
-        else:
+        rp = robots_parser_for_host(host, delay_s)
+        if rp is None:
             # No robots found or failed; default allow
             return True
         return rp.can_fetch(UA_STR, url)
@@ -276,90 +621,166 @@ def is_allowed_by_robots(url: str, delay_s: float) -> bool:
 def is_valid_email_syntax(email: str) -> bool:
     return EMAIL_REGEX.fullmatch(email or "") is not None
 
-def mx_lookup(domain_name: str) -> bool:
-    if dnsresolver is None:
-        return False
+MX_WORKERS = 8
+
+# Bounded resolver so one slow nameserver cannot stall a crawl worker
+try:
+    _mx_resolver = dnsresolver.Resolver() if dnsresolver is not None else None
+    if _mx_resolver is not None:
+        _mx_resolver.timeout = 2
+        _mx_resolver.lifetime = 3
+except Exception:
+    _mx_resolver = None
+
+# MX results per domain for this run; info@/sales@/contact@ share one lookup
+_mx_cache: dict[str, bool | None] = {}
+_mx_cache_lock = threading.Lock()
+
+def mx_lookup(domain_name: str) -> bool | None:
+    # True/False for a definitive answer (MX found, NXDOMAIN, no MX records);
+    # None when DNS couldn't tell (timeout, unreachable nameservers), so the
+    # caller doesn't persist it and the next run resolves again
+    if _mx_resolver is None:
+        return None
+    with _mx_cache_lock:
+        if domain_name in _mx_cache:
+            return _mx_cache[domain_name]
     try:
-        answers = dnsresolver.resolve(domain_name, "MX")
-        return len(list(answers)) > 0
+        answers = _mx_resolver.resolve(domain_name, "MX")
+        ok = len(list(answers)) > 0
+    except (dnsresolver.NXDOMAIN, dnsresolver.NoAnswer):
+        ok = False
     except Exception:
-        return False
-
-def verify_email(email: str, do_mx: bool) -> tuple[bool, str]:
+        ok = None
+    with _mx_cache_lock:
+        _mx_cache[domain_name] = ok
+    return ok
+
+def prefetch_mx(emails: list[str]):
+    # Resolve the distinct, not-yet-cached domains concurrently
+    if _mx_resolver is None:
+        return
+    domains = {e.split("@", 1)[1].lower() for e in emails if "@" in e}
+    with _mx_cache_lock:
+        pending = [d for d in domains if d not in _mx_cache]
+    if len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=min(MX_WORKERS, len(pending))) as ex:
+            list(ex.map(mx_lookup, pending))
+
+def verify_email(email: str, do_mx: bool) -> tuple[bool | None, str]:
+    # ok is None when the MX check was inconclusive
     if not is_valid_email_syntax(email):
         return False, ""
     mx_dom = ""
     if do_mx:
         try:
             mx_dom = email.split("@", 1)[1].lower()
-            ok = mx_lookup(mx_dom)
-            return ok, mx_dom if ok else mx_dom
+            return mx_lookup(mx_dom), mx_dom
         except Exception:
-            return False, mx_dom
+            return None, mx_dom
     return True, ""
 
+def verify_emails(emails: list[str], do_mx: bool, known: dict | None = None) -> tuple[list[str], str, dict]:
+    # Returns (verified emails, MX domain of the last verified one, MX checks).
+    # `known` holds earlier MX checks (email -> [ok, mx_domain, checked_at]);
+    # ones still within the cache TTL are reused instead of hitting DNS again.
+    # Inconclusive checks (DNS timeouts) count as unverified but are left out
+    # of the returned checks, so they are retried rather than cached.
+    now = time.time()
+    fresh = {e: v for e, v in (known or {}).items() if now - v[2] < CACHE_TTL_SECONDS} if do_mx else {}
+    if do_mx:
+        prefetch_mx([e for e in emails if e not in fresh])
+    verified_emails = []
+    mx_domain = ""
+    checks = {}
+    for e in emails:
+        if e in fresh:
+            ok, mx_dom, checked_at = fresh[e]
+        else:
+            ok, mx_dom = verify_email(e, do_mx=do_mx)
+            checked_at = now
+        if do_mx and ok is not None:
+            checks[e] = [ok, mx_dom, checked_at]
+        if ok:
+            verified_emails.append(e)
+            if mx_dom:
+                mx_domain = mx_dom
+    return verified_emails, mx_domain, checks
+
 # ----------------------------
 # Crawl with robots + cache + email verify
 # ----------------------------
-def crawl_for_emails(start_url: str, delay_s: float = 0.7, do_mx: bool = False):
+def crawl_for_emails(
+    start_url: str,
+    delay_s: float = 0.7,
+    do_mx: bool = False,
+    homepage_html: str | None = None,
+    homepage_tree=None,
+):
+    # Pass homepage_html (and its parsed tree) when the caller already fetched
+    # start_url; the robots check and homepage fetch are then skipped
     # Check cache of extracted emails
-    emails_cached, phone_cached, ts = cache_get_emails(start_url)
+    emails_cached, phone_cached, ts, verified_cached = cache_get_emails(start_url)
     now = time.time()
     if emails_cached is not None and phone_cached is not None and ts and (now - ts) < CACHE_TTL_SECONDS:
-        # Do verification pass here since verification can be toggled dynamically
-        verified_emails = []
-        mx_domain = ""
-        for e in emails_cached:
-            ok, mx_dom = verify_email(e, do_mx=do_mx)
-            if ok:
-                verified_emails.append(e)
-                if mx_dom:
-                    mx_domain = mx_dom
+        # Do verification pass here since verification can be toggled dynamically;
+        # MX results stored with the row are reused while fresh
+        verified_emails, mx_domain, checks = verify_emails(emails_cached, do_mx, known=verified_cached)
+        if do_mx and checks != verified_cached:
+            cache_put_emails(start_url, emails_cached, phone_cached, ts, checks)
         return sorted(verified_emails if verified_emails else emails_cached), phone_cached, (len(verified_emails) > 0), mx_domain
 
     emails = set()
     phone = ""
 
-    # robots check for homepage
-    if not is_allowed_by_robots(start_url, delay_s):
-        return [], "", False, ""
-
-    r = safe_get(start_url)
-    if r and getattr(r, "ok", True):
-        html = r.text
-        emails |= set(extract_emails_from_text(html))
-        phone = extract_phone(html) or phone
-
-        # crawl likely contact pages with robots checks
-        for p in find_likely_contact_pages(start_url, html):
-            if not is_allowed_by_robots(p, delay_s):
-                continue
-            time.sleep(delay_s)
-            rp = safe_get(p)
-            if rp and getattr(rp, "ok", True):
-                emails |= set(extract_emails_from_text(rp.text))
-                phone = extract_phone(rp.text) or phone
+    if homepage_html is None:
+        # robots check for homepage
+        if not is_allowed_by_robots(start_url, delay_s):
+            return [], "", False, ""
+
+        r = safe_get(start_url, delay_s=delay_s)
+        if r and getattr(r, "ok", True):
+            homepage_html = r.text
+
+    if homepage_html is not None:
+        html = homepage_html
+        # Reuse the caller's parse of the homepage for the text scan
+        tree = homepage_tree
+        if tree is None:
+            try:
+                tree = parse_html(html)
+            except Exception:
+                tree = None
+        found, page_phone = scan_page(html, tree)
+        emails |= found
+        phone = page_phone or phone
+
+        # crawl likely contact pages with robots checks; host_slot() in
+        # safe_get keeps same-host fetches capped at PER_HOST_CONCURRENCY
+        contact_pages = [
+            p for p in find_likely_contact_pages(start_url, html)
+            if not is_skippable_url(p) and is_allowed_by_robots(p, delay_s)
+        ]
+        if contact_pages:
+            with ThreadPoolExecutor(max_workers=PER_HOST_CONCURRENCY) as ex:
+                for rp in ex.map(lambda p: safe_get(p, delay_s=delay_s), contact_pages):
+                    if rp and getattr(rp, "ok", True):
+                        found, page_phone = scan_page(rp.text)
+                        emails |= found
+                        phone = page_phone or phone
 
     emails_list = sorted(emails)
-    cache_put_emails(start_url, emails_list, phone, time.time())
 
     # Verify
-    verified_emails = []
-    mx_domain = ""
-    for e in emails_list:
-        ok, mx_dom = verify_email(e, do_mx=do_mx)
-        if ok:
-            verified_emails.append(e)
-            if mx_dom:
-                mx_domain = mx_dom
+    verified_emails, mx_domain, checks = verify_emails(emails_list, do_mx)
+    cache_put_emails(start_url, emails_list, phone, time.time(), checks)
 
     if verified_emails:
         return sorted(verified_emails), phone, True, mx_domain
     return emails_list, phone, False, mx_domain
 
 def looks_like_competitor(name: str) -> bool:
-    n = (name or "").lower()
-    return any(w in n for w in COMPETITOR_WORDS)
+    return COMPETITOR_REGEX.search(name or "") is not None
 
 # ----------------------------
 # Search engines
@@ -368,11 +789,13 @@ def ddg_search(q: str, max_results: int = 30, delay_s: float = 0.8) -> list[dict
     results = []
     url = "https://html.duckduckgo.com/html/"
     try:
-        time.sleep(delay_s)
-        r = requests.post(url, data={"q": q}, headers=UA, timeout=15)
+        wait_for_host(url, delay_s)
+        r = SESSION.post(url, data={"q": q}, timeout=15)
         if not r or not r.ok:
             return results
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = BeautifulSoup(
+            r.content, "lxml", from_encoding=response_encoding(r), parse_only=SoupStrainer("a")
+        )
         for a in soup.select("a.result__a"):
             href = a.get("href")
             title = a.get_text(strip=True)
@@ -389,26 +812,22 @@ def bing_search(q: str, max_results: int = 30, delay_s: float = 0.8) -> list[dic
     base = "https://www.bing.com/search"
     params = {"q": q, "count": max(10, min(max_results, 50))}
     try:
-        time.sleep(delay_s)
-        r = requests.get(base, params=params, headers=UA, timeout=15)
+        wait_for_host(base, delay_s)
+        r = SESSION.get(base, params=params, timeout=15)
         if not r or not r.ok:
             return results
-        soup = BeautifulSoup(r.text, "html.parser")
-        for a in soup.select("li.b_algo h2 a"):
+        # Only result items are needed from the page; page chrome and nav
+        # links are never treated as results
+        soup = BeautifulSoup(
+            r.content, "lxml", from_encoding=response_encoding(r), parse_only=SoupStrainer("li")
+        )
+        for a in soup.select("li.b_algo h2 a, li.b_algo .b_title a"):
             href = a.get("href")
             title = a.get_text(strip=True)
             if href and title:
                 results.append({"title": title, "link": href, "engine": "bing"})
             if len(results) >= max_results:
                 break
-        if len(results) < max_results:
-            for a in soup.select("a"):
-                href = a.get("href")
-                title = a.get_text(strip=True)
-                if href and title and href.startswith(("http://", "https://")):
-                    results.append({"title": title, "link": href, "engine": "bing"})
-                if len(results) >= max_results:
-                    break
     except Exception:
         pass
     return results
@@ -418,13 +837,13 @@ def google_search(q: str, max_results: int = 30, delay_s: float = 0.8) -> list[d
     base = "https://www.google.com/search"
     params = {"q": q, "num": max(10, min(max_results, 50)), "hl": "en"}
     try:
-        time.sleep(delay_s)
-        r = requests.get(base, params=params, headers=UA, timeout=15)
+        wait_for_host(base, delay_s)
+        r = SESSION.get(base, params=params, timeout=15)
         if not r or not r.ok:
             return results
 
         if "consent.google.com" in r.url or "consent" in (r.text[:2000].lower()):
-            soup_c = BeautifulSoup(r.text, "html.parser")
+            soup_c = BeautifulSoup(r.text, "lxml")
             form = soup_c.find("form")
             if form and form.get("action"):
                 action = urljoin(r.url, form["action"])
@@ -434,25 +853,27 @@ def google_search(q: str, max_results: int = 30, delay_s: float = 0.8) -> list[d
                     v = inp.get("value", "")
                     if n:
                         payload[n] = v
-                time.sleep(delay_s)
-                r = requests.post(action, data=payload, headers=UA, timeout=15)
-
-        soup = BeautifulSoup(r.text, "html.parser")
-        for a in soup.select("a"):
-            href = a.get("href", "")
-            if href.startswith("/url?"):
-                qs = parse_qs(urlparse(href).query)
-                target = qs.get("q", [""])[0]
-                title = a.get_text(strip=True)
-                if target.startswith(("http://", "https://")) and title:
-                    results.append({"title": title, "link": target, "engine": "google"})
-                    if len(results) >= max_results:
-                        break
+                wait_for_host(action, delay_s)
+                r = SESSION.post(action, data=payload, timeout=15)
+
+        soup = BeautifulSoup(
+            r.content, "lxml", from_encoding=response_encoding(r), parse_only=SoupStrainer(["div", "a"])
+        )
+        # Basic-HTML results link through /url?q=...
+        for a in soup.select("a[href^='/url?']"):
+            qs = parse_qs(urlparse(a.get("href", "")).query)
+            target = qs.get("q", [""])[0]
+            title = a.get_text(strip=True)
+            if target.startswith(("http://", "https://")) and title:
+                results.append({"title": title, "link": target, "engine": "google"})
+                if len(results) >= max_results:
+                    break
+        # Full-page results link directly from the result header
         if len(results) < max_results:
-            for a in soup.select("a"):
+            for a in soup.select("div.yuRUbf > a[href^='http']"):
                 href = a.get("href", "")
                 title = a.get_text(strip=True)
-                if href.startswith(("http://", "https://")) and title:
+                if title:
                     results.append({"title": title, "link": href, "engine": "google"})
                     if len(results) >= max_results:
                         break
@@ -460,29 +881,45 @@ def google_search(q: str, max_results: int = 30, delay_s: float = 0.8) -> list[d
         pass
     return results
 
+SEARCH_ENGINES = {
+    "DuckDuckGo": ddg_search,
+    "Bing": bing_search,
+    "Google": google_search,
+}
+
+def cached_search(engine: str, q: str, max_results: int, delay_s: float) -> list[dict]:
+    # Serve repeat queries from cache_search so re-runs skip the engine round trip
+    hits, ts = cache_get_search(engine, q, max_results)
+    if hits is not None and ts and (time.time() - ts) < SEARCH_CACHE_TTL_SECONDS:
+        return hits
+    hits = SEARCH_ENGINES[engine](q, max_results=max_results, delay_s=delay_s)
+    if hits:
+        cache_put_search(engine, q, max_results, hits, time.time())
+    return hits
+
+def _dedupe_key(h: dict) -> tuple:
+    p = parse_url(normalize_url(h["link"]))
+    return (p.scheme, p.netloc.lower(), p.path)
+
 def merge_and_dedupe(hits: list[dict], prefer_order=("duckduckgo", "bing", "google")) -> list[dict]:
-    seen_key = {}
+    # First-seen order is kept; a duplicate from a preferred engine replaces
+    # the earlier hit in place (O(1) via the key -> position map)
+    rank = {name: i for i, name in enumerate(prefer_order)}
+    key_to_idx = {}
     ordered = []
     for h in hits:
         try:
-            p = urlparse(normalize_url(h["link"]))
-            key = (p.scheme, p.netloc.lower(), p.path)
+            key = _dedupe_key(h)
         except Exception:
             continue
-        if key not in seen_key:
-            seen_key[key] = h
+        idx = key_to_idx.get(key)
+        if idx is None:
+            key_to_idx[key] = len(ordered)
             ordered.append(h)
-        else:
-            prev = seen_key[key]
-            if h["engine"] in prefer_order and prev["engine"] in prefer_order:
-                if prefer_order.index(h["engine"]) < prefer_order.index(prev["engine"]):
-                    seen_key[key] = h
-                    for i, it in enumerate(ordered):
-                        pp = urlparse(normalize_url(it["link"]))
-                        kk = (pp.scheme, pp.netloc.lower(), pp.path)
-                        if kk == key:
-                            ordered[i] = h
-                            break
+            continue
+        prev = ordered[idx]
+        if h["engine"] in rank and prev["engine"] in rank and rank[h["engine"]] < rank[prev["engine"]]:
+            ordered[idx] = h
     return ordered
 
 # ----------------------------
@@ -507,6 +944,10 @@ with st.sidebar:
     max_results = st.slider("Max results per engine per query", 5, 50, 25, 5)
     include_flooring_companies = st.checkbox("Include flooring companies in leads", value=True)
     request_delay = st.slider("Polite delay between requests (seconds)", 0.3, 2.0, 0.8, 0.1)
+    crawl_workers = st.slider(
+        "Sites crawled in parallel", 1, 32, CRAWL_WORKERS, 1,
+        help="The polite delay still applies per site; only different sites are fetched at the same time.",
+    )
     enable_mx = st.checkbox("Verify emails with MX lookup (needs dnspython)", value=False)
 
     st.markdown("**Allow domains** (only crawl if matches; optional)")
@@ -543,19 +984,157 @@ def parse_domain_rules(text: str) -> list[str]:
         items.append(line.lower())
     return items
 
+def compile_domain_rules(rules: list[str]) -> re.Pattern | None:
+    # One suffix regex per list; a rule matches the domain itself or any
+    # subdomain ("x.com" matches "www.x.com" but not "fedex.com")
+    rules = [r.lstrip(".") for r in rules if r.lstrip(".")]
+    if not rules:
+        return None
+    return re.compile(r"(?:^|\.)(?:" + "|".join(map(re.escape, rules)) + r")$")
+
 allow_domains = parse_domain_rules(allow_domains_text)
 deny_domains = parse_domain_rules(deny_domains_text)
+ALLOW_REGEX = compile_domain_rules(allow_domains)
+DENY_REGEX = compile_domain_rules(deny_domains)
 
 def is_allowed_by_lists(url: str) -> bool:
     host = domain(url)
     if not host:
         return False
-    for d in deny_domains:
-        if host.endswith(d):
-            return False
-    if allow_domains:
-        return any(host.endswith(d) for d in allow_domains)
-    return True
+    if DENY_REGEX and DENY_REGEX.search(host):
+        return False
+    return ALLOW_REGEX is None or ALLOW_REGEX.search(host) is not None
+
+def process_hit(hit: dict, include_flooring: bool, delay_s: float, do_mx: bool) -> dict | None:
+    # Runs on a worker thread: settings come in as arguments and no Streamlit
+    # calls are made in here
+    url = normalize_url(hit["link"])
+    if not url.startswith(("http://", "https://")) or is_skippable_url(url):
+        return None
+
+    # Quick robots check before any fetch
+    if not is_allowed_by_robots(url, delay_s):
+        return None
+
+    r = safe_get(url, delay_s=delay_s)
+    if not (r and getattr(r, "ok", True) and getattr(r, "text", None)):
+        return None
+
+    # Parse the homepage once; the tree is shared by name extraction and the
+    # contact-info scan in crawl_for_emails
+    try:
+        tree = parse_html(r.text)
+    except Exception:
+        tree = None
+
+    name = extract_company_name(r.text, url, tree=tree)
+    if (not include_flooring) and looks_like_competitor(name):
+        return None
+
+    emails, phone, any_verified, mx_domain = crawl_for_emails(
+        url, delay_s=delay_s, do_mx=do_mx, homepage_html=r.text, homepage_tree=tree
+    )
+    if not emails:
+        return None
+
+    # Prefer first verified email if we have any
+    selected_email = emails[0]
+
+    return {
+        "Company": name,
+        "Email": selected_email,
+        "Website": url,
+        "Phone": phone,
+        "Source": hit["engine"],
+        "EmailVerified": "Yes" if any_verified else ("SyntaxOnly" if emails else "No"),
+        "MXDomain": mx_domain,
+    }
+
+def leads_dataframe() -> pd.DataFrame:
+    df = pd.DataFrame(st.session_state.leads_rows, columns=LEAD_COLUMNS)
+    return df.astype({"Source": "category"})
+
+@contextmanager
+def worker_pool(max_workers: int):
+    # `with ThreadPoolExecutor()` waits for every queued task on the way out,
+    # even when Streamlit is unwinding a rerun/stop raised from a progress
+    # update; drop the queued work in that case so the rerun starts at once
+    ex = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        yield ex
+    except BaseException:
+        ex.shutdown(wait=False, cancel_futures=True)
+        raise
+    ex.shutdown(wait=True)
+
+def throttled_progress(bar, total: int, steps: int = 20, min_interval: float = 0.1):
+    # Each progress() call is a websocket round trip; push at most ~`steps`
+    # updates, and no more than one per `min_interval` seconds when items
+    # finish quickly (cache hits), but always the final one
+    min_step = 1.0 / max(1, steps)
+    last = {"frac": 0.0, "at": 0.0}
+
+    def update(done: int):
+        frac = min(1.0, done / max(1, total))
+        now = time.monotonic()
+        if frac >= 1.0 or (frac - last["frac"] >= min_step and now - last["at"] >= min_interval):
+            if frac != last["frac"]:
+                bar.progress(frac)
+            last["frac"], last["at"] = frac, now
+
+    return update
+
+def rows_to_csv_bytes(columns: list[str], rows: list[dict]) -> bytes:
+    # Encode straight into a bytes buffer instead of DataFrame.to_csv().encode()
+    buf = io.BytesIO()
+    text = io.TextIOWrapper(buf, encoding="utf-8", newline="")
+    writer = csv.DictWriter(text, fieldnames=columns, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    text.flush()
+    data = buf.getvalue()
+    text.detach()
+    return data
+
+def leads_csv_bytes() -> bytes:
+    # The download button re-renders on every rerun; only re-encode when the
+    # leads changed. Rows are only appended, and Clear Leads swaps in a new list.
+    rows = st.session_state.leads_rows
+    cached = st.session_state.get("leads_csv")
+    if cached is None or cached[0] is not rows or cached[1] != len(rows):
+        cached = (rows, len(rows), rows_to_csv_bytes(LEAD_COLUMNS, rows))
+        st.session_state.leads_csv = cached
+    return cached[2]
+
+def compile_template(template: str, constants: dict):
+    # Parse the template once and pre-render the placeholders that are the same
+    # for every draft; the returned function only fills the per-lead fields
+    fmt = string.Formatter()
+    parts = []  # static text, or (field, conversion, spec) filled per row
+    static = []
+    for literal, field, spec, conv in fmt.parse(template):
+        static.append(literal)
+        if field is None:
+            continue
+        if field in constants:
+            static.append(fmt.format_field(fmt.convert_field(constants[field], conv), spec))
+        else:
+            parts.append("".join(static))
+            parts.append((field, conv, spec))
+            static = []
+    parts.append("".join(static))
+
+    def render(**fields) -> str:
+        out = []
+        for part in parts:
+            if isinstance(part, str):
+                out.append(part)
+            else:
+                field, conv, spec = part
+                out.append(fmt.format_field(fmt.convert_field(fields[field], conv), spec))
+        return "".join(out)
+
+    return render
 
 # ----------------------------
 # Tabs
@@ -572,27 +1151,31 @@ with tab1:
         clear = st.button("Clear Leads")
 
     if clear:
-        st.session_state.leads_df = st.session_state.leads_df.iloc[0:0]
+        st.session_state.leads_rows = []
+        st.session_state.lead_keys = set()
+        st.session_state.crawled_domains = set()
         st.success("Leads cleared.")
 
     if run:
         all_hits = []
-        progress = st.progress(0.0)
-        total_q = max(1, len(queries))
-        for i, q in enumerate(queries, 1):
-            local_hits = []
-            if "DuckDuckGo" in engines:
-                local_hits.extend(ddg_search(q, max_results=max_results, delay_s=request_delay))
-            if "Bing" in engines:
-                local_hits.extend(bing_search(q, max_results=max_results, delay_s=request_delay))
-            if "Google" in engines:
-                local_hits.extend(google_search(q, max_results=max_results, delay_s=request_delay))
-
-            merged_local = merge_and_dedupe(local_hits)
-            all_hits.extend(merged_local)
-
-            progress.progress(i / total_q)
-            time.sleep(0.2)
+        progress = throttled_progress(st.progress(0.0), len(queries))
+        enabled_engines = [engine for engine in SEARCH_ENGINES if engine in engines]
+        # The engines are different hosts, so each query hits them in parallel;
+        # per-engine pacing stays inside the search functions
+        with worker_pool(max(1, len(enabled_engines))) as search_ex:
+            for i, q in enumerate(queries, 1):
+                local_hits = []
+                engine_results = search_ex.map(
+                    lambda engine: cached_search(engine, q, max_results, request_delay), enabled_engines
+                )
+                for hits in engine_results:  # engine order, so merge preference is unchanged
+                    local_hits.extend(hits)
+
+                merged_local = merge_and_dedupe(local_hits)
+                all_hits.extend(merged_local)
+
+                progress(i)
+                time.sleep(0.2)
 
         # Global dedupe
         all_hits = merge_and_dedupe(all_hits)
@@ -600,67 +1183,58 @@ with tab1:
         # Apply allow/deny lists
         filtered_hits = [h for h in all_hits if is_allowed_by_lists(h["link"])]
 
-        st.info(f"Found {len(filtered_hits)} unique result links after filters. Crawling sites for emails...")
-        crawl_prog = st.progress(0.0)
-        new_rows = []
-        total_hits = max(1, len(filtered_hits))
-        for idx, hit in enumerate(filtered_hits, 1):
-            url = normalize_url(hit["link"])
-            if not url.startswith(("http://", "https://")):
-                crawl_prog.progress(idx / total_hits)
-                continue
-
-            # Quick robots check before any fetch
-            if not is_allowed_by_robots(url, request_delay):
-                crawl_prog.progress(idx / total_hits)
-                continue
-
-            r = safe_get(url)
-            if not (r and getattr(r, "text", None)):
-                crawl_prog.progress(idx / total_hits)
-                continue
-
-            name = extract_company_name(r.text, url)
-            if (not include_flooring_companies) and looks_like_competitor(name):
-                crawl_prog.progress(idx / total_hits)
-                continue
-
-            emails, phone, any_verified, mx_domain = crawl_for_emails(url, delay_s=request_delay, do_mx=enable_mx)
-            if not emails:
-                crawl_prog.progress(idx / total_hits)
-                continue
-
-            # Prefer first verified email if we have any
-            selected_email = emails[0]
-
-            new_rows.append(
-                {
-                    "Company": name,
-                    "Email": selected_email,
-                    "Website": url,
-                    "Phone": phone,
-                    "Source": hit["engine"],
-                    "EmailVerified": "Yes" if any_verified else ("SyntaxOnly" if emails else "No"),
-                    "MXDomain": mx_domain,
-                }
-            )
-            crawl_prog.progress(idx / total_hits)
+        # Crawl each site once: overlapping queries return the same domains,
+        # and domains that gave a lead on an earlier run (until Clear Leads) are skipped
+        unique_hits = {}
+        for h in filtered_hits:
+            d = domain(normalize_url(h["link"]))
+            if d and d not in st.session_state.crawled_domains and d not in unique_hits:
+                unique_hits[d] = h
+        crawl_hits = list(unique_hits.values())
+
+        st.info(
+            f"Found {len(filtered_hits)} unique result links after filters "
+            f"({len(crawl_hits)} new sites). Crawling sites for emails..."
+        )
+        crawl_prog = throttled_progress(st.progress(0.0), len(crawl_hits))
+        # Crawl sites concurrently; rows are kept in hit order so dedupe below
+        # still favours the higher-ranked result
+        results = [None] * len(crawl_hits)
+        with worker_pool(crawl_workers) as ex:
+            futures = {
+                ex.submit(process_hit, hit, include_flooring_companies, request_delay, enable_mx): i
+                for i, hit in enumerate(crawl_hits)
+            }
+            for idx, fut in enumerate(as_completed(futures), 1):
+                results[futures[fut]] = fut.result()
+                crawl_prog(idx)
+        # Only sites that produced a row count as done; ones skipped as
+        # competitors, blocked by robots or that failed to fetch are retried
+        # next run (cheaply, through the page/email caches)
+        st.session_state.crawled_domains.update(
+            d for d, row in zip(unique_hits, results) if row
+        )
+        new_rows = [row for row in results if row]
 
         if new_rows:
-            df_new = pd.DataFrame(new_rows)
-            merged = pd.concat([st.session_state.leads_df, df_new], ignore_index=True)
-            merged.drop_duplicates(subset=["Email", "Website"], keep="first", inplace=True)
-            st.session_state.leads_df = merged.reset_index(drop=True)
-            st.success(f"Added {len(df_new)} new leads. Total leads: {len(st.session_state.leads_df)}")
+            added = 0
+            for row in new_rows:
+                key = (row["Email"], row["Website"])
+                if key not in st.session_state.lead_keys:
+                    st.session_state.lead_keys.add(key)
+                    st.session_state.leads_rows.append(row)
+                    added += 1
+            st.success(f"Added {added} new leads. Total leads: {len(st.session_state.leads_rows)}")
         else:
             st.warning("No emails found. Try adjusting queries or filters, or reduce request delay if safe.")
 
-    if not st.session_state.leads_df.empty:
+    if st.session_state.leads_rows:
+        leads_df = leads_dataframe()
         st.subheader("Leads")
-        st.dataframe(st.session_state.leads_df, use_container_width=True, height=380)
+        st.dataframe(leads_df, use_container_width=True, height=380)
 
         # Download CSV
-        csv_bytes = st.session_state.leads_df.to_csv(index=False).encode()
+        csv_bytes = leads_csv_bytes()
         st.download_button(
             "Download CSV",
             data=csv_bytes,
@@ -697,35 +1271,47 @@ with tab2:
     template_text = st.text_area("Email template (use the placeholders below)", value=template_default, height=280)
     st.caption("Placeholders: {company_or_contact} {sender_name} {sender_title} {phone_display} {website_display} {sender_email} {recipient_email}")
 
-    if st.session_state.leads_df.empty:
+    if not st.session_state.leads_rows:
         st.warning("No leads yet. Go to the Find Leads tab first.")
     else:
+        leads_rows = st.session_state.leads_rows
+        # Labels are built once per rerun; format_func is then a list lookup
+        lead_labels = [f"{lead['Company']} — {lead['Email']}" for lead in leads_rows]
         sel = st.multiselect(
             "Choose companies",
-            options=st.session_state.leads_df.index,
-            format_func=lambda i: f"{st.session_state.leads_df.loc[i,'Company']} — {st.session_state.leads_df.loc[i,'Email']}",
-            default=st.session_state.leads_df.index.tolist(),
+            options=range(len(leads_rows)),
+            format_func=lead_labels.__getitem__,
+            default=list(range(len(leads_rows))),
         )
 
         if st.button("Create Draft Emails CSV", type="primary"):
             rows = []
+            constants = {
+                "sender_name": sender_name,
+                "sender_title": sender_title,
+                "phone_display": phone_display,
+                "website_display": website_display,
+                "sender_email": sender_email,
+            }
+            # Split off a leading "Subject:" line once, then fill subject and
+            # body separately instead of re-scanning every filled draft
+            has_subject = template_text[:len("Subject:")].lower() == "subject:"
+            subject_template, body_template = "", template_text
+            if has_subject:
+                subject_line, _, body_template = template_text.partition("\n")
+                subject_template = subject_line[len("Subject:"):]
+            fill_subject = compile_template(subject_template, constants)
+            fill_body = compile_template(body_template, constants)
             for i in sel:
-                row = st.session_state.leads_df.loc[i]
-                filled = template_text.format(
-                    company_or_contact=(row["Company"] or "Team"),
-                    sender_name=sender_name,
-                    sender_title=sender_title,
-                    phone_display=phone_display,
-                    website_display=website_display,
-                    sender_email=sender_email,
-                    recipient_email=row["Email"],
-                )
-                subject = ""
-                body = filled
-                if filled.lower().startswith("subject:"):
-                    first_newline = filled.find("\n")
-                    subject = filled[len("Subject:"):first_newline].strip()
-                    body = filled[first_newline+1:].lstrip()
+                row = leads_rows[i]
+                fields = {
+                    "company_or_contact": (row["Company"] or "Team"),
+                    "recipient_email": row["Email"],
+                }
+                subject = fill_subject(**fields).strip()
+                body = fill_body(**fields)
+                if has_subject:
+                    body = body.lstrip()
 
                 rows.append(
                     {
@@ -738,9 +1324,8 @@ with tab2:
                         "Body": body,
                     }
                 )
-            out_df = pd.DataFrame(rows)
-            csv_out = out_df.to_csv(index=False).encode()
-            st.success(f"Created {len(out_df)} email drafts.")
+            csv_out = rows_to_csv_bytes(DRAFT_COLUMNS, rows)
+            st.success(f"Created {len(rows)} email drafts.")
             st.download_button(
                 "Download Draft Emails CSV",
                 data=csv_out,